@@ -0,0 +1,112 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Union
+
+import pandas as pd
+from models import EXPENSE_DIRECTIONS, Headers
+
+try:
+    import duckdb
+except ImportError:  # optional dependency, only needed for SQL analytics
+    duckdb = None
+
+# SQL type of each Headers dtype (the timestamp is already a date in the pipeline output)
+_SQL_TYPES = {
+    "string": "VARCHAR",
+    "float64": "DOUBLE",
+    "boolean": "BOOLEAN",
+    "datetime64[ns]": "DATE",
+}
+
+
+def _column_sql(header: Headers) -> str:
+    sql_type = "VARCHAR[]" if header is Headers.TAGS else _SQL_TYPES[header.dtype]
+    return f'CAST("{header.target_name}" AS {sql_type}) AS "{header.target_name}"'
+
+
+def _expense_sql() -> str:
+    """SQL condition matching expenses (money going out)."""
+    directions = ", ".join(f"'{d}'" for d in EXPENSE_DIRECTIONS)
+    return f"upper(direction) IN ({directions})"
+
+
+# Predefined views, all built on top of the typed 'transactions' view
+VIEWS = {
+    "monthly_spend": f"""
+        SELECT date_trunc('month', timestamp)::DATE AS month, category,
+               round(sum(amount), 2) AS spend, count(*) AS transactions
+        FROM transactions
+        WHERE {_expense_sql()} AND NOT coalesce(is_transfer, false)
+        GROUP BY ALL
+    """,
+    "net_flow": f"""
+        SELECT date_trunc('month', timestamp)::DATE AS month,
+               round(coalesce(sum(amount) FILTER (WHERE NOT {_expense_sql()}), 0), 2) AS income,
+               round(coalesce(sum(amount) FILTER (WHERE {_expense_sql()}), 0), 2) AS spend,
+               round(sum(CASE WHEN {_expense_sql()} THEN -amount ELSE amount END), 2) AS net
+        FROM transactions
+        WHERE NOT coalesce(is_transfer, false)
+        GROUP BY ALL
+    """,
+    "transfer_excluded_totals": f"""
+        SELECT account,
+               round(coalesce(sum(amount) FILTER (WHERE NOT {_expense_sql()}), 0), 2) AS income,
+               round(coalesce(sum(amount) FILTER (WHERE {_expense_sql()}), 0), 2) AS spend,
+               round(sum(CASE WHEN {_expense_sql()} THEN -amount ELSE amount END), 2) AS net
+        FROM transactions
+        WHERE NOT coalesce(is_transfer, false)
+        GROUP BY ALL
+    """,
+}
+
+
+def _require_duckdb():
+    """Returns the duckdb module or explains how to get it."""
+    if duckdb is None:
+        raise ImportError("SQL analytics need the 'duckdb' package: pip install duckdb")
+    return duckdb
+
+
+def connect(source: Union[pd.DataFrame, Path], database: str = ":memory:"):
+    """
+    Opens a DuckDB connection with the normalized dataset registered as views.
+
+    Args:
+        source: The DataFrame returned by load_transactions() (scanned in
+            place, no copy), or the path of a Parquet file/directory written
+            by export_parquet().
+        database: DuckDB database file, in memory by default.
+
+    Views:
+        transactions: one column per Headers target name (+ keys), typed
+        monthly_spend, net_flow, transfer_excluded_totals: see VIEWS
+    """
+    con = _require_duckdb().connect(database)
+
+    if isinstance(source, pd.DataFrame):
+        con.register("transactions_source", source)
+    else:
+        pattern = str(source / "*.parquet") if Path(source).is_dir() else str(source)
+        con.execute(
+            "CREATE OR REPLACE VIEW transactions_source AS "
+            f"SELECT * FROM read_parquet('{pattern}')"
+        )
+
+    columns = [_column_sql(header) for header in Headers]
+    columns += ["identity_key", "idempotency_key"]
+    con.execute(
+        "CREATE OR REPLACE VIEW transactions AS "
+        f"SELECT {', '.join(columns)} FROM transactions_source"
+    )
+    for name, query in VIEWS.items():
+        con.execute(f"CREATE OR REPLACE VIEW {name} AS {query}")
+    return con
+
+
+def export_parquet(df: pd.DataFrame, path: Path) -> None:
+    """Writes the normalized dataset to Parquet through DuckDB (no pyarrow needed)."""
+    con = connect(df)
+    try:
+        con.execute(f"COPY transactions TO '{path}' (FORMAT parquet, COMPRESSION zstd)")
+    finally:
+        con.close()
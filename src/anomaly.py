@@ -0,0 +1,139 @@
+from __future__ import annotations
+from typing import Tuple
+import warnings
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from models import Headers
+
+# How many previous transactions of the same category/payee are the "normal" baseline
+WINDOW = 12
+# Below this many previous transactions I don't score at all (not enough history)
+MIN_PERIODS = 3
+# Span of the exponentially weighted mean used as 'expected' amount
+EWMA_SPAN = 6
+# Robust z-score above which a row is flagged
+Z_THRESHOLD = 3.5
+# A fixed fee (e.g., 'Bolli') has MAD = 0: use at least this share of the median as spread
+MIN_RELATIVE_SPREAD = 0.05
+
+# Groups scored separately: (Headers target name, output column prefix)
+GROUPINGS: Tuple[Tuple[str, str], ...] = (
+    (Headers.CATEGORY.target_name, "category"),
+    (Headers.COUNTERPARTY.target_name, "payee"),
+)
+
+SCORE_COL = "anomaly_score"
+FLAG_COL = "is_anomaly"
+
+
+def _rolling_median_mad(
+    values: np.ndarray, groups: np.ndarray, window: int, min_periods: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Median and MAD of the previous `window` values of the same group, for every row.
+
+    `values` must be sorted by group and then by time. The windows of all rows
+    are built at once as a strided (n, window) view, and values belonging to
+    another group are masked out, so there is no Python loop over rows or groups.
+    """
+    n = len(values)
+    padded = np.concatenate([np.full(window, np.nan), values])
+    padded_groups = np.concatenate([np.full(window, -1), groups])
+
+    # Row i sees values[i - window : i] (the current value is excluded)
+    windows = sliding_window_view(padded, window)[:n]
+    window_groups = sliding_window_view(padded_groups, window)[:n]
+    windows = np.where(window_groups == groups[:, None], windows, np.nan)
+    enough = (~np.isnan(windows)).sum(axis=1) >= min_periods
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN windows are expected
+        median = np.nanmedian(windows, axis=1)
+        mad = np.nanmedian(np.abs(windows - median[:, None]), axis=1)
+
+    median[~enough] = np.nan
+    mad[~enough] = np.nan
+    return median, mad
+
+
+def score_anomalies(
+    df: pd.DataFrame, window: int = WINDOW, min_periods: int = MIN_PERIODS
+) -> pd.DataFrame:
+    """
+    Scores every non-transfer row against the recent history of its category and payee.
+
+    Added columns (per grouping, e.g. 'category_median'):
+        <group>_median, <group>_ewma: expected amount from previous rows
+        <group>_score: robust z-score, 0.6745 * (amount - median) / MAD
+        anomaly_score: the largest score of the row (only spikes matter,
+            an unusually small charge is not an anomaly for me)
+        is_anomaly: anomaly_score above Z_THRESHOLD
+    """
+    amount = Headers.AMOUNT.target_name
+    date_col = Headers.TIMESTAMP.target_name
+
+    result = df.copy()
+    spending = ~df[Headers.IS_TRANSFER.target_name].fillna(False).astype(bool)
+    scores = []
+
+    for key, prefix in GROUPINGS:
+        rows = df[spending & df[key].notna()]
+        codes = pd.Series(pd.factorize(rows[key])[0], index=rows.index)
+        order = (
+            pd.DataFrame({"code": codes, "date": pd.to_datetime(rows[date_col])})
+            .sort_values(["code", "date"], kind="stable").index
+        )
+        values = rows.loc[order, amount].to_numpy(dtype=float)
+
+        median, mad = _rolling_median_mad(values, codes[order].to_numpy(), window, min_periods)
+        spread = np.maximum(mad, MIN_RELATIVE_SPREAD * np.abs(median))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = 0.6745 * (values - median) / spread
+
+        # Grouped EWMA of the previous amounts (pandas does this per group in C)
+        previous = rows.loc[order, amount].groupby(codes[order]).shift(1)
+        ewma = (
+            previous.groupby(codes[order]).ewm(span=EWMA_SPAN, min_periods=1).mean()
+            .reset_index(level=0, drop=True)
+        )
+
+        result[f"{prefix}_median"] = pd.Series(median, index=order)
+        result[f"{prefix}_ewma"] = ewma.round(2)
+        result[f"{prefix}_score"] = pd.Series(z, index=order).round(2)
+        scores.append(result[f"{prefix}_score"])
+
+    result[SCORE_COL] = pd.concat(scores, axis=1).max(axis=1, skipna=True)
+    result[FLAG_COL] = result[SCORE_COL] > Z_THRESHOLD
+    return result
+
+
+def update_anomalies(
+    scored_history: pd.DataFrame, new_rows: pd.DataFrame, window: int = WINDOW
+) -> pd.DataFrame:
+    """
+    Scores only the newly arrived rows (e.g., a new month of exports).
+
+    Only the last `window` rows of each category/payee are taken from the
+    history as context, which is all the rolling statistics need. The EWMA
+    restarts from that context, so it is a close approximation of a full recompute.
+    """
+    date_col = Headers.TIMESTAMP.target_name
+    history = scored_history[new_rows.columns.intersection(scored_history.columns)]
+    history = history.sort_values(date_col, kind="stable")
+
+    # Same rows score_anomalies() looks at: transfers and rows without a key
+    # would otherwise take the place of real context in the tail
+    spending = ~history[Headers.IS_TRANSFER.target_name].fillna(False).astype(bool)
+    context_index = pd.Index([])
+    for key, _ in GROUPINGS:
+        eligible = history[spending & history[key].notna()]
+        context_index = context_index.union(eligible.groupby(key).tail(window).index)
+    context = history.loc[context_index]
+
+    combined = pd.concat([context, new_rows], ignore_index=True)
+    scored = score_anomalies(combined, window=window)
+    new_part = scored.iloc[len(context):]
+    new_part.index = new_rows.index
+    return new_part
@@ -0,0 +1,403 @@
+from __future__ import annotations
+from collections import OrderedDict
+from datetime import date, datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Hashable, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+import asyncio
+import hashlib
+import json
+
+import pandas as pd
+from models import Headers
+import converters
+import forecast
+import utils
+
+# Query results kept in memory (per dataset version)
+CACHE_SIZE = 256
+# Max rows returned by /transactions when no 'limit' is given
+DEFAULT_LIMIT = 1000
+# Seconds between two checks of the source on disk
+RELOAD_SECONDS = 5
+
+AGGREGATIONS = ("sum", "mean", "count", "min", "max")
+# Aggregations that only make sense on numbers (booleans count as 0/1)
+NUMERIC_AGGREGATIONS = ("sum", "mean")
+NUMERIC_DTYPES = ("float64", "boolean")
+
+_STATUS_TEXT = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+
+class LRUCache:
+    """Tiny least-recently-used cache on top of an OrderedDict."""
+
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self._items: OrderedDict[Hashable, bytes] = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        if key not in self._items:
+            return None
+        self._items.move_to_end(key)
+        return self._items[key]
+
+    def put(self, key: Hashable, value: bytes) -> None:
+        self._items[key] = value
+        self._items.move_to_end(key)
+        if len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._items
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+def _source_stamp(source: Path) -> int:
+    """Latest modification time (ns) of an export file, or of a profile's partitions."""
+    files = [source] if source.is_file() else list(source.glob("partitions/*.pkl.gz"))
+    return max((path.stat().st_mtime_ns for path in files), default=0)
+
+
+def _load_source(source: Path) -> pd.DataFrame:
+    """Loads an export file (see main.load_transactions) or a profile directory."""
+    if source.is_dir():
+        from profiles import Profile
+
+        return Profile(source.name, source.parent).load()
+    from main import load_transactions
+
+    return load_transactions(source)
+
+
+class TransactionStore:
+    """The normalized transactions loaded once, plus their version and query cache."""
+
+    def __init__(self, df: pd.DataFrame, source: Optional[Path] = None):
+        self.cache = LRUCache()
+        self.version: Optional[str] = None
+        # Where the data comes from, watched by refresh() (None = never reloaded)
+        self.source = source
+        self.source_stamp = _source_stamp(source) if source is not None else None
+        self.ingest(df)
+
+    @classmethod
+    def from_source(cls, source: Path) -> TransactionStore:
+        """Loads an export file or a profile directory (e.g. data/profiles/<name>)."""
+        return cls(_load_source(source), source)
+
+    def ingest(self, df: pd.DataFrame) -> None:
+        """
+        Replaces the dataset: new version, new Last-Modified, empty cache.
+
+        Re-ingesting the same data (same version) changes nothing, so the
+        cache and the clients' conditional requests stay valid.
+        """
+        version = utils.dataset_version(df)
+        if version == self.version:
+            return
+        self.df = df
+        self.version = version
+        # When this version was first seen (HTTP dates have a 1 second resolution)
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+        self.cache.clear()
+
+    def refresh(self) -> bool:
+        """
+        Reloads the source if it changed on disk since it was last loaded
+        (e.g., a new export was saved, or ingest_profile() rewrote a partition).
+
+        Returns:
+            bool: True if the source was reloaded.
+        """
+        if self.source is None:
+            return False
+        stamp = _source_stamp(self.source)
+        if stamp == self.source_stamp:
+            return False
+        self.source_stamp = stamp
+        self.ingest(_load_source(self.source))
+        return True
+
+
+class BadRequest(ValueError):
+    """A query parameter that cannot be applied to the dataset."""
+
+
+def _filter(df: pd.DataFrame, params: Dict[str, str]) -> pd.DataFrame:
+    """
+    Applies the query filters to the DataFrame.
+
+    Any Headers target name can be used as 'field=value', plus
+    'from'/'to' (inclusive ISO dates) on the timestamp.
+    """
+    mask = pd.Series(True, index=df.index)
+    date_col = Headers.TIMESTAMP.target_name
+
+    for key, value in params.items():
+        if key in ("from", "to"):
+            try:
+                bound = date.fromisoformat(value)
+            except ValueError:
+                raise BadRequest(f"'{key}' must be an ISO date (YYYY-MM-DD), got '{value}'.")
+            dates = pd.to_datetime(df[date_col]).dt.date
+            mask &= (dates >= bound) if key == "from" else (dates <= bound)
+            continue
+
+        header = _header_from_target(key)
+        if header is None:
+            continue  # not a filter (e.g., 'limit', 'by', 'op')
+        column = df[header.target_name]
+
+        if header is Headers.TAGS:
+            mask &= column.map(lambda tags: value in tags)
+        elif header.dtype == "boolean":
+            flag = value.strip().lower()
+            if flag not in converters.TRUE_VALUES + converters.FALSE_VALUES:
+                raise BadRequest(f"'{key}' must be true or false, got '{value}'.")
+            mask &= column == (flag in converters.TRUE_VALUES)
+        elif header.dtype == "float64":
+            try:
+                mask &= column == float(value)
+            except ValueError:
+                raise BadRequest(f"'{key}' must be a number, got '{value}'.")
+        else:
+            mask &= column.astype(str) == value
+
+    return df[mask.fillna(False).astype(bool)]
+
+
+def _header_from_target(target_name: str) -> Optional[Headers]:
+    for header in Headers:
+        if header.target_name == target_name:
+            return header
+    return None
+
+
+def _to_records(df: pd.DataFrame) -> list:
+    """Converts rows to JSON-friendly dicts (NA -> None)."""
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def query_transactions(store: TransactionStore, params: Dict[str, str]) -> dict:
+    """GET /transactions: filtered rows."""
+    try:
+        limit = int(params.get("limit", DEFAULT_LIMIT))
+    except ValueError:
+        raise BadRequest("'limit' must be an integer.")
+    rows = _filter(store.df, params)
+    return {"count": len(rows), "rows": _to_records(rows.head(limit))}
+
+
+def query_aggregate(store: TransactionStore, params: Dict[str, str]) -> dict:
+    """GET /aggregate?by=category&field=amount&op=sum: grouped totals."""
+    by = params.get("by", Headers.CATEGORY.target_name)
+    field = params.get("field", Headers.AMOUNT.target_name)
+    op = params.get("op", "sum")
+
+    by_header, field_header = _header_from_target(by), _header_from_target(field)
+    if by_header is None or field_header is None:
+        raise BadRequest("'by' and 'field' must be Headers target names.")
+    if by == field:
+        raise BadRequest("'by' and 'field' must differ (use field=amount&op=count to count rows).")
+    if by_header is Headers.TAGS:
+        raise BadRequest("Cannot group by 'tags' (a list per row): filter with 'tags=...' instead.")
+    if op not in AGGREGATIONS:
+        raise BadRequest(f"'op' must be one of {AGGREGATIONS}.")
+    if field_header is Headers.TAGS and op != "count":
+        raise BadRequest("Only 'count' can be applied to 'tags'.")
+    if op in NUMERIC_AGGREGATIONS and field_header.dtype not in NUMERIC_DTYPES:
+        raise BadRequest(f"'{op}' needs a numeric field, '{field}' is {field_header.dtype}.")
+
+    rows = _filter(store.df, params)
+    grouped = rows.groupby(by, dropna=False)[field].agg(op)
+    return {"by": by, "field": field, "op": op, "groups": _to_records(grouped.reset_index())}
+
+
+def query_forecast(store: TransactionStore, params: Dict[str, str]) -> dict:
+    """GET /forecast?horizon=3: projected monthly spending per category."""
+    try:
+        horizon = int(params.get("horizon", forecast.HORIZON))
+    except ValueError:
+        raise BadRequest("'horizon' must be an integer.")
+    if not 1 <= horizon <= 24:
+        raise BadRequest("'horizon' must be between 1 and 24 months.")
+    projected = forecast.cached_forecast(store.df, horizon, version=store.version)
+    return {"horizon": horizon, "forecast": _to_records(projected)}
+
+
+ROUTES = {
+    "/transactions": query_transactions,
+    "/aggregate": query_aggregate,
+    "/forecast": query_forecast,
+}
+
+
+def _cache_key(store: TransactionStore, target: str) -> Tuple[Hashable, ...]:
+    """Cache key of a request: dataset version + path + sorted query parameters."""
+    url = urlsplit(target)
+    return (store.version, url.path, tuple(sorted(parse_qsl(url.query))))
+
+
+def handle_request(
+    store: TransactionStore, target: str, headers: Dict[str, str]
+) -> Tuple[int, Dict[str, str], bytes]:
+    """
+    Computes (status, headers, body) for a GET request.
+
+    Bodies are cached per (dataset version, path, query), so repeated
+    dashboard loads skip pandas entirely.
+    """
+    url = urlsplit(target)
+    params = dict(parse_qsl(url.query))
+
+    if url.path == "/version":
+        body = json.dumps({"version": store.version, "rows": len(store.df)}).encode("utf-8")
+        return 200, {"Cache-Control": "no-cache"}, body
+
+    route = ROUTES.get(url.path)
+    if route is None:
+        return 404, {}, b'{"error": "not found"}'
+
+    cache_key = _cache_key(store, target)
+    etag = f'"{store.version}-{hashlib.sha1(repr(cache_key).encode()).hexdigest()[:12]}"'
+    response_headers = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(store.last_modified, usegmt=True),
+        "Cache-Control": "no-cache",
+    }
+    if _not_modified(store, etag, headers):
+        return 304, response_headers, b""
+
+    body = store.cache.get(cache_key)
+    if body is None:
+        try:
+            result = route(store, params)
+        except BadRequest as e:
+            return 400, {}, json.dumps({"error": str(e)}).encode("utf-8")
+        body = json.dumps(result, default=str).encode("utf-8")
+        store.cache.put(cache_key, body)
+
+    return 200, response_headers, body
+
+
+def _not_modified(store: TransactionStore, etag: str, headers: Dict[str, str]) -> bool:
+    """Conditional GET: If-None-Match wins over If-Modified-Since (RFC 9110)."""
+    if "if-none-match" in headers:
+        return etag in [tag.strip() for tag in headers["if-none-match"].split(",")]
+    if "if-modified-since" in headers:
+        try:
+            since = parsedate_to_datetime(headers["if-modified-since"])
+        except (TypeError, ValueError):
+            return False
+        return store.last_modified <= since
+    return False
+
+
+async def _serve_client(
+    store: TransactionStore, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    """Handles the requests of one connection (keep-alive supported)."""
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            method, target, version = request_line.decode("latin-1").split(" ", 2)
+
+            headers: Dict[str, str] = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            try:
+                if method not in ("GET", "HEAD"):
+                    status, extra, body = 405, {"Allow": "GET, HEAD"}, b""
+                elif _cache_key(store, target) in store.cache:
+                    status, extra, body = handle_request(store, target, headers)
+                else:
+                    # Cache misses run pandas in a worker thread to keep the loop responsive
+                    status, extra, body = await asyncio.to_thread(
+                        handle_request, store, target, headers
+                    )
+            except Exception as e:
+                # A bug in a query must still give the client a proper reply
+                status, extra = 500, {}
+                body = json.dumps({"error": f"internal error ({type(e).__name__})"}).encode("utf-8")
+
+            response = [f"HTTP/1.1 {status} {_STATUS_TEXT[status]}"]
+            response += [f"{name}: {value}" for name, value in extra.items()]
+            response += ["Content-Type: application/json", f"Content-Length: {len(body)}"]
+            writer.write(("\r\n".join(response) + "\r\n\r\n").encode("latin-1"))
+            if method == "GET":
+                writer.write(body)
+            await writer.drain()
+
+            if headers.get("connection", "").lower() == "close" or version.strip() == "HTTP/1.0":
+                break
+    except (ConnectionError, ValueError):
+        pass  # client went away or sent garbage: just drop the connection
+    finally:
+        writer.close()
+
+
+async def _watch_source(store: TransactionStore, interval: float) -> None:
+    """Checks the store's source every `interval` seconds and reloads it when it changed."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if await asyncio.to_thread(store.refresh):
+                print(f"🔄 Reloaded {len(store.df)} transactions (version {store.version})")
+        except Exception as e:
+            # A half-written or broken export must not take the API down
+            print(f"⚠️ Reload of {store.source} failed: {e}")
+
+
+async def serve(
+    store: TransactionStore,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    reload_seconds: float = RELOAD_SECONDS,
+) -> None:
+    """
+    Runs the read-only API until cancelled. Local-only by default (Privacy First).
+
+    If the store has a source, it is reloaded when it changes on disk, which
+    gives a new version, a new Last-Modified and an empty cache.
+    """
+    server = await asyncio.start_server(
+        lambda r, w: _serve_client(store, r, w), host=host, port=port
+    )
+    print(f"📊 Serving {len(store.df)} transactions (version {store.version}) on http://{host}:{port}")
+    watcher = (
+        asyncio.create_task(_watch_source(store, reload_seconds))
+        if store.source is not None else None
+    )
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+
+
+if __name__ == "__main__":
+    import sys
+
+    # An export file or a profile directory, the sample export by default
+    default_file = Path(__file__).parent.parent / "data" / "fake_wallet_record.csv"
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else default_file
+    asyncio.run(serve(TransactionStore.from_source(source)))
@@ -0,0 +1,43 @@
+from pathlib import Path
+import tempfile
+import time
+
+import pandas as pd
+from main import load_transactions
+import sinks
+
+# Repeat the sample export to get a dataset big enough to measure
+REPEAT = 5_000
+
+
+def _time_sink(sink, df: pd.DataFrame) -> float:
+    """Writes the DataFrame through a sink in pipeline-sized batches, returns seconds."""
+    start = time.perf_counter()
+    with sink:
+        for begin in range(0, len(df), sinks.CHUNK_ROWS):
+            sink.write(df.iloc[begin:begin + sinks.CHUNK_ROWS])
+    return time.perf_counter() - start
+
+
+def bench_sinks() -> None:
+    """Compares the encrypted sink against the plaintext CSV sink."""
+    data_file = Path(__file__).parent.parent / "data" / "fake_wallet_record.csv"
+    sample = load_transactions(data_file)
+    df = pd.concat([sample] * REPEAT, ignore_index=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        plain_path = Path(tmp) / "out.csv"
+        encrypted_path = Path(tmp) / "out.csv.enc"
+
+        plain_s = _time_sink(sinks.CsvSink(plain_path), df)
+        encrypted_s = _time_sink(sinks.EncryptedSink(encrypted_path, sinks.generate_key()), df)
+        size_mb = plain_path.stat().st_size / 1_000_000
+
+        print(f"Rows: {len(df):,} ({size_mb:.1f} MB of CSV)")
+        print(f"Plaintext sink: {plain_s:.3f} s ({size_mb / plain_s:.1f} MB/s)")
+        print(f"Encrypted sink: {encrypted_s:.3f} s ({size_mb / encrypted_s:.1f} MB/s)")
+        print(f"Overhead: {(encrypted_s / plain_s - 1) * 100:+.1f}%")
+
+
+if __name__ == "__main__":
+    bench_sinks()
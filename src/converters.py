@@ -0,0 +1,123 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+from models import Headers
+
+# A converter takes the raw text column and returns the typed column.
+# It must work on the whole Series at once (no row-by-row Python loops).
+Converter = Callable[[pd.Series], pd.Series]
+
+# Dispatch table: Headers member -> converter
+_CONVERTERS: Dict[Headers, Converter] = {}
+
+TRUE_VALUES = ("true", "1", "yes", "si", "sì")
+FALSE_VALUES = ("false", "0", "no")
+
+# '1.234,56' / '12,5': the comma is the decimal mark (dots can only group thousands)
+_COMMA_DECIMAL = r"[-+]?(\d{1,3}(\.\d{3})+|\d+),\d+"
+# '1,234.56' / '1,234': commas group thousands, the dot (if any) is the decimal mark
+_COMMA_THOUSANDS = r"[-+]?\d{1,3}(,\d{3})+(\.\d+)?"
+
+
+def register_converter(header: Headers) -> Callable[[Converter], Converter]:
+    """
+    Decorator that registers (or replaces) the converter of a column.
+
+    Example:
+        @register_converter(Headers.NOTE)
+        def upper_note(values: pd.Series) -> pd.Series:
+            return values.str.upper()
+    """
+    def decorator(func: Converter) -> Converter:
+        _CONVERTERS[header] = func
+        return func
+    return decorator
+
+
+def get_converter(header: Headers) -> Converter:
+    """Returns the converter currently registered for a column."""
+    return _CONVERTERS[header]
+
+
+def to_string(values: pd.Series) -> pd.Series:
+    """Strips whitespace and turns empty cells into None."""
+    values = values.astype("string").str.strip()
+    # Replace empty strings with NA first
+    values = values.replace("", pd.NA)
+    # Convert to object type and fill remaining NA with None
+    return values.astype(object).where(values.notna(), None)
+
+
+def to_float(values: pd.Series) -> pd.Series:
+    """
+    Parses numbers, accepting '1234.56', the English '1,234.56' and the Italian '1.234,56'.
+
+    The comma is a decimal mark only when it's the last separator; when the
+    dot comes last, commas are thousands separators. Anything else with a
+    comma is ambiguous ('1,234' could be either, '1,2,3' is neither) and
+    becomes NaN, like every other unparsable cell (not 0.0), so it
+    propagates through math.
+    """
+    values = values.astype("string").str.strip()
+    comma_decimal = values.str.fullmatch(_COMMA_DECIMAL).fillna(False)
+    comma_thousands = values.str.fullmatch(_COMMA_THOUSANDS).fillna(False)
+    has_comma = values.str.contains(",", regex=False).fillna(False)
+
+    italian = values.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    english = values.str.replace(",", "", regex=False)
+    values = values.where(~comma_decimal, italian).where(~comma_thousands, english)
+    values = values.mask(has_comma & (comma_decimal == comma_thousands), pd.NA)
+    return pd.to_numeric(values, errors="coerce").astype("float64").round(2)
+
+
+def to_boolean(values: pd.Series) -> pd.Series:
+    """Maps 'true'/'false' strings (and friends) to a nullable boolean column."""
+    lowered = values.astype("string").str.strip().str.lower()
+    mapping = {value: True for value in TRUE_VALUES}
+    mapping.update({value: False for value in FALSE_VALUES})
+    return lowered.map(mapping).astype("boolean")
+
+
+def to_datetime(values: pd.Series) -> pd.Series:
+    """Parses ISO 8601 timestamps (e.g., '2026-01-10T08:34:29.920Z') as UTC."""
+    return pd.to_datetime(values, format="ISO8601", utc=True, errors="coerce")
+
+
+def split_tags(values: pd.Series) -> pd.Series:
+    """Splits comma-separated labels into lists (empty list when missing)."""
+    values = values.astype("string").str.strip().replace("", pd.NA)
+    tags = values.str.split(r"\s*,\s*", regex=True).astype(object)
+    missing = tags.isna()
+    tags[missing] = pd.Series([[] for _ in range(missing.sum())], index=tags.index[missing])
+    return tags
+
+
+# Default converters, chosen from the dtype declared in Headers
+_DEFAULTS_BY_DTYPE: Dict[str, Converter] = {
+    "string": to_string,
+    "float64": to_float,
+    "boolean": to_boolean,
+    "datetime64[ns]": to_datetime,
+}
+
+for _header in Headers:
+    register_converter(_header)(_DEFAULTS_BY_DTYPE[_header.dtype])
+register_converter(Headers.TAGS)(split_tags)
+
+
+def apply_converters(df: pd.DataFrame, max_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Runs the registered converters on a DataFrame with clean target names.
+
+    Each column is independent, so they are converted in parallel in a
+    thread pool and assigned back once all of them are done.
+    """
+    headers: List[Headers] = [h for h in Headers if h.target_name in df.columns]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        converted = pool.map(lambda h: get_converter(h)(df[h.target_name]), headers)
+        results = dict(zip((h.target_name for h in headers), converted))
+
+    return df.assign(**results)
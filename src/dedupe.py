@@ -0,0 +1,154 @@
+from __future__ import annotations
+from difflib import SequenceMatcher
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+from models import Headers
+
+# Two rows further apart than this (in days) are never compared
+DATE_WINDOW_DAYS = 2
+# Minimum score for a pair to be flagged as a likely duplicate
+SCORE_THRESHOLD = 0.75
+# How much the text similarity weighs in the score (the rest is date closeness)
+TEXT_WEIGHT = 0.7
+# Text similarity of two rows that both have no note and no payee: no evidence
+# either way, so same account + amount + date alone stays below SCORE_THRESHOLD
+NO_TEXT_SIMILARITY = 0.5
+# Same account and amount entered this many seconds apart scores 0.5 on time alone
+# (seconds apart ~1.0, a minute ~0.9, five minutes 0.5): nobody buys the same
+# thing twice in a few seconds, so no text is needed to flag it
+REPEAT_HALF_LIFE_SECONDS = 300
+
+# Full-precision timestamp added by load_transactions(); 'timestamp' only has the date
+RECORDED_AT_COL = "recorded_at"
+
+CLUSTER_COL = "duplicate_cluster"
+SCORE_COL = "duplicate_score"
+
+
+def _text_similarity(a: str, b: str) -> float:
+    """Similarity of two short free texts in [0, 1]; two empty texts are neutral."""
+    if not a and not b:
+        return NO_TEXT_SIMILARITY
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def _times(df: pd.DataFrame) -> pd.Series:
+    """When each row was recorded, to the second if known (else only the date)."""
+    if RECORDED_AT_COL in df.columns:
+        return pd.to_datetime(df[RECORDED_AT_COL], utc=True).dt.tz_localize(None)
+    return pd.to_datetime(df[Headers.TIMESTAMP.target_name])
+
+
+def _candidate_pairs(df: pd.DataFrame, window_days: int) -> pd.DataFrame:
+    """
+    Finds the pairs of rows sharing account and amount within `window_days`
+    (calendar days), with how many days and seconds apart they were recorded.
+
+    Rows are sorted by (account, amount in cents, date), so candidates are
+    always neighbours. Instead of comparing all pairs, I compare each row
+    with the next one, then the one after, and so on, stopping as soon as
+    no row has a candidate at that distance (sorted-window sweep).
+    """
+    account = Headers.ACCOUNT.target_name
+    keys = pd.DataFrame({
+        "account": df[account].astype(str).to_numpy(),
+        "cents": (df[Headers.AMOUNT.target_name] * 100).round().astype("Int64").to_numpy(),
+        "day": pd.to_datetime(df[Headers.TIMESTAMP.target_name]).to_numpy(),
+        "time": _times(df).to_numpy(),
+        "row": np.arange(len(df)),
+    }).sort_values(["account", "cents", "time"], ignore_index=True)
+
+    window = np.timedelta64(window_days, "D")
+    pairs: List[pd.DataFrame] = []
+    offset = 1
+    while offset < len(keys):
+        other = keys.shift(-offset)
+        same_block = (keys["account"] == other["account"]) & (keys["cents"] == other["cents"])
+        close = (other["day"] - keys["day"]) <= window
+        hit = (same_block & close).fillna(False).astype(bool)
+        if not hit.any():
+            break
+        pairs.append(pd.DataFrame({
+            "left": keys.loc[hit, "row"].to_numpy(),
+            "right": other.loc[hit, "row"].astype(int).to_numpy(),
+            "days": ((other.loc[hit, "day"] - keys.loc[hit, "day"]) / np.timedelta64(1, "D")).to_numpy(),
+            "seconds": ((other.loc[hit, "time"] - keys.loc[hit, "time"]) / np.timedelta64(1, "s")).to_numpy(),
+        }))
+        offset += 1
+
+    if not pairs:
+        return pd.DataFrame({"left": [], "right": [], "days": [], "seconds": []})
+    return pd.concat(pairs, ignore_index=True)
+
+
+def _find(parent: Dict[int, int], x: int) -> int:
+    """Union-find root lookup (with path halving)."""
+    while parent.setdefault(x, x) != x:
+        parent[x] = parent[parent[x]]
+        x = parent[x]
+    return x
+
+
+def find_near_duplicates(
+    df: pd.DataFrame,
+    window_days: int = DATE_WINDOW_DAYS,
+    threshold: float = SCORE_THRESHOLD,
+) -> pd.DataFrame:
+    """
+    Flags groups of rows that are probably the same transaction entered twice.
+
+    Nothing is dropped: the returned copy has two extra columns,
+    'duplicate_cluster' (same id = same suspected transaction, NA if unique)
+    and 'duplicate_score' (best pair score of the row, in [0, 1]).
+
+    A pair scores the best of two signals:
+      - text similarity blended with date closeness (rows with no note and
+        no payee get a neutral text score, so the same day alone is not enough)
+      - how close in time they were recorded, on a scale of minutes: the same
+        purchase saved twice seconds apart is flagged even without text.
+        This needs the full timestamp ('recorded_at' from load_transactions());
+        with dates only, it's skipped.
+    """
+    pairs = _candidate_pairs(df, window_days)
+
+    # Text is only compared inside the blocks, never across the whole dataset
+    note = df[Headers.NOTE.target_name].fillna("").astype(str).str.lower().str.strip()
+    payee = df[Headers.COUNTERPARTY.target_name].fillna("").astype(str).str.lower().str.strip()
+    # No note and no payee -> empty text (not " | "), so it scores as neutral
+    text = np.where((note == "") & (payee == ""), "", note + " | " + payee)
+    left = pairs["left"].to_numpy(dtype=int)
+    right = pairs["right"].to_numpy(dtype=int)
+    similarity = np.array([_text_similarity(text[a], text[b]) for a, b in zip(left, right)])
+    closeness = 1 - pairs["days"].to_numpy(dtype=float) / (window_days + 1)
+    scores = TEXT_WEIGHT * similarity + (1 - TEXT_WEIGHT) * closeness if len(pairs) else np.array([])
+    if RECORDED_AT_COL in df.columns and len(pairs):
+        repeat = 0.5 ** (pairs["seconds"].to_numpy(dtype=float) / REPEAT_HALF_LIFE_SECONDS)
+        scores = np.maximum(scores, repeat)
+
+    # Merge accepted pairs into clusters (A~B and B~C -> one cluster)
+    parent: Dict[int, int] = {}
+    best = np.zeros(len(df))
+    for a, b, score in zip(left, right, scores):
+        if score < threshold:
+            continue
+        parent[_find(parent, a)] = _find(parent, b)
+        best[a] = max(best[a], score)
+        best[b] = max(best[b], score)
+
+    cluster = pd.array([pd.NA] * len(df), dtype="Int64")
+    for row in parent:
+        cluster[row] = _find(parent, row)
+
+    result = df.copy()
+    result[CLUSTER_COL] = cluster
+    result[SCORE_COL] = best.round(3)
+    return result
+
+
+def duplicate_report(flagged: pd.DataFrame) -> pd.DataFrame:
+    """Only the flagged rows, grouped by cluster, for manual review."""
+    return flagged[flagged[CLUSTER_COL].notna()].sort_values(
+        [CLUSTER_COL, Headers.TIMESTAMP.target_name]
+    )
@@ -0,0 +1,129 @@
+from __future__ import annotations
+from typing import Dict, Optional, Tuple
+import threading
+
+import numpy as np
+import pandas as pd
+from models import EXPENSE_DIRECTIONS, Headers
+import utils
+
+# Months projected into the future
+HORIZON = 3
+# Months in a season (yearly seasonality)
+SEASON = 12
+# Smoothing factor of simple exponential smoothing (higher = follows recent months more)
+ALPHA = 0.3
+
+# Fitted forecasts, keyed by (dataset version, horizon)
+_CACHE: Dict[Tuple[str, int], pd.DataFrame] = {}
+# The API calls cached_forecast() from worker threads
+_CACHE_LOCK = threading.Lock()
+
+
+def monthly_spend(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Builds the months x categories matrix of spending (transfers excluded).
+
+    Months without any transaction in a category are 0, and the index has no
+    gaps, so every column is a regular monthly series.
+    """
+    direction = df[Headers.DIRECTION.target_name].fillna("").astype(str).str.upper()
+    is_transfer = df[Headers.IS_TRANSFER.target_name].fillna(False).astype(bool)
+    expenses = df[direction.isin(EXPENSE_DIRECTIONS) & ~is_transfer]
+
+    months = pd.to_datetime(expenses[Headers.TIMESTAMP.target_name]).dt.to_period("M")
+    matrix = expenses.pivot_table(
+        index=months,
+        columns=Headers.CATEGORY.target_name,
+        values=Headers.AMOUNT.target_name,
+        aggfunc="sum",
+        fill_value=0.0,
+    )
+    if matrix.empty:
+        return matrix
+    full_range = pd.period_range(matrix.index.min(), matrix.index.max(), freq="M")
+    return matrix.reindex(full_range, fill_value=0.0)
+
+
+def seasonal_naive(values: np.ndarray, horizon: int, season: int = SEASON) -> np.ndarray:
+    """
+    Next months = same months one season ago, for all columns at once.
+
+    With less than one season of history, the last month is repeated instead.
+    """
+    n = values.shape[0]
+    if n >= season:
+        rows = n - season + (np.arange(horizon) % season)
+    else:
+        rows = np.full(horizon, n - 1)
+    return values[rows]
+
+
+def exponential_smoothing(values: np.ndarray, horizon: int, alpha: float = ALPHA) -> np.ndarray:
+    """
+    Simple exponential smoothing for all columns at once.
+
+    The final level is a weighted sum of the history, so it's a single
+    matrix product instead of a loop: weight alpha * (1 - alpha)^age for each
+    month, and (1 - alpha)^(n - 1) for the first one (the initial level).
+    """
+    n = values.shape[0]
+    ages = np.arange(n - 1, -1, -1)
+    weights = alpha * (1 - alpha) ** ages
+    weights[0] = (1 - alpha) ** (n - 1)
+    level = weights @ values
+    # Flat forecast: the same level for every future month
+    return np.repeat(level[None, :], horizon, axis=0)
+
+
+MODELS = {
+    "seasonal_naive": seasonal_naive,
+    "exponential_smoothing": exponential_smoothing,
+}
+
+
+def forecast_spending(df: pd.DataFrame, horizon: int = HORIZON) -> pd.DataFrame:
+    """
+    Projects the monthly spending of every category with every model.
+
+    Returns:
+        pd.DataFrame: Long format with columns month, category, model, amount.
+    """
+    matrix = monthly_spend(df)
+    columns = ["month", Headers.CATEGORY.target_name, "model", "amount"]
+    if matrix.empty:
+        return pd.DataFrame(columns=columns)
+
+    future = pd.period_range(matrix.index[-1] + 1, periods=horizon, freq="M")
+    values = matrix.to_numpy(dtype=float)
+
+    frames = []
+    for name, model in MODELS.items():
+        projected = pd.DataFrame(
+            model(values, horizon).round(2), index=future.astype(str), columns=matrix.columns
+        )
+        long = projected.rename_axis("month").reset_index().melt(
+            id_vars="month", var_name=Headers.CATEGORY.target_name, value_name="amount"
+        )
+        frames.append(long.assign(model=name))
+
+    return pd.concat(frames, ignore_index=True)[columns]
+
+
+def cached_forecast(
+    df: pd.DataFrame, horizon: int = HORIZON, version: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Same as forecast_spending(), but fitted only once per dataset version.
+
+    Only the latest version is kept: a new ingestion drops older results.
+    Pass `version` when it's already known, hashing the dataset is not free.
+    """
+    version = version or utils.dataset_version(df)
+    key = (version, horizon)
+    with _CACHE_LOCK:
+        if key not in _CACHE:
+            for old_key in [k for k in _CACHE if k[0] != version]:
+                del _CACHE[old_key]
+            _CACHE[key] = forecast_spending(df, horizon)
+        return _CACHE[key]
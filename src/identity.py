@@ -0,0 +1,101 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import List
+
+import pandas as pd
+from models import Headers
+
+IDENTITY_COL = "identity_key"
+# Disambiguates rows sharing an identity key (e.g., two identical charges in the same millisecond)
+OCCURRENCE_COL = "_occurrence"
+
+# Fields compared between two exports of the same transaction (derived keys
+# like idempotency_key change with them, so they'd only repeat the same edit)
+TRACKED_FIELDS: List[str] = [header.target_name for header in Headers]
+
+
+@dataclass
+class ChangeSet:
+    """What changed between the previous and the current export."""
+    inserted: pd.DataFrame  # rows only in the current export
+    updated: pd.DataFrame   # current version of rows whose fields changed
+    deleted: pd.DataFrame   # rows only in the previous export
+    diffs: pd.DataFrame     # one row per changed field: identity_key, _occurrence, field, old, new
+
+    @property
+    def is_empty(self) -> bool:
+        return self.inserted.empty and self.updated.empty and self.deleted.empty
+
+    def summary(self) -> str:
+        """Return a human-readable one-line summary."""
+        return (
+            f"➕ {len(self.inserted)} inserted | ✏️ {len(self.updated)} updated "
+            f"({len(self.diffs)} fields) | ➖ {len(self.deleted)} deleted"
+        )
+
+
+def with_occurrence(df: pd.DataFrame) -> pd.DataFrame:
+    """Adds the occurrence number of each row among those sharing its identity key (0, 1, ...)."""
+    return df.assign(**{OCCURRENCE_COL: df.groupby(IDENTITY_COL).cumcount()})
+
+
+def _same(old: pd.Series, new: pd.Series) -> pd.Series:
+    """Element-wise equality where two missing values count as equal."""
+    equal = (old == new).fillna(False).astype(bool)
+    return equal | (old.isna() & new.isna())
+
+
+def diff_exports(previous: pd.DataFrame, current: pd.DataFrame) -> ChangeSet:
+    """
+    Matches two normalized exports on the identity key and returns the changes.
+
+    The match is a single hash join (pandas merge) on the key, so it stays
+    fast on years of history. Both frames need the 'identity_key' column
+    added by load_transactions().
+    """
+    fields = [f for f in TRACKED_FIELDS if f in previous.columns and f in current.columns]
+    on = [IDENTITY_COL, OCCURRENCE_COL]
+
+    merged = pd.merge(
+        with_occurrence(previous)[on + fields],
+        with_occurrence(current)[on + fields].assign(_row=range(len(current))),
+        on=on,
+        how="outer",
+        suffixes=("_old", "_new"),
+        indicator=True,
+    )
+
+    only_new = merged.loc[merged["_merge"] == "right_only", "_row"]
+    inserted = current.iloc[only_new.astype(int).to_numpy()]
+
+    deleted_keys = merged.loc[merged["_merge"] == "left_only", on]
+    deleted = (
+        with_occurrence(previous)
+        .merge(deleted_keys, on=on)
+        .drop(columns=OCCURRENCE_COL)
+    )
+
+    # Field-level diffs, one vectorized comparison per column
+    both = merged[merged["_merge"] == "both"]
+    diff_frames = []
+    for field in fields:
+        old, new = both[f"{field}_old"], both[f"{field}_new"]
+        changed = ~_same(old, new)
+        if changed.any():
+            diff_frames.append(pd.DataFrame({
+                IDENTITY_COL: both.loc[changed, IDENTITY_COL],
+                OCCURRENCE_COL: both.loc[changed, OCCURRENCE_COL],
+                "field": field,
+                "old": old[changed].astype(object),
+                "new": new[changed].astype(object),
+            }))
+    diffs = (
+        pd.concat(diff_frames, ignore_index=True) if diff_frames
+        else pd.DataFrame(columns=on + ["field", "old", "new"])
+    )
+
+    # Only the occurrence that changed, not every row sharing its identity key
+    updated_rows = both.merge(diffs[on].drop_duplicates(), on=on)["_row"].sort_values()
+    updated = current.iloc[updated_rows.astype(int).to_numpy()]
+
+    return ChangeSet(inserted=inserted, updated=updated, deleted=deleted, diffs=diffs)
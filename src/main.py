@@ -1,69 +1,86 @@
 from pathlib import Path
+from typing import List, Optional, TextIO
 import pandas as pd
 from models import Headers
+import converters
+import schemas
+import sources
 import utils
 
-def main():
-    """Execute the data processing from csv to dataframe."""
+# Rows parsed at a time, so big exports never need the whole text in memory
+CHUNK_ROWS = 100_000
 
-    # Targeting the file
-    data_dir = Path(__file__).parent.parent / "data"
-    filename = "fake_wallet_record.csv"
-    data_file = data_dir / filename
+def read_export(stream: TextIO, stats: sources.ExportStats) -> pd.DataFrame:
+    """Parse one export stream into a DataFrame with clean column names."""
+
+    # Detect the export layout from the header line and reuse its cached reader config
+    variant = schemas.detect_variant(stream.readline())
+    config = schemas.compile_reader_config(variant)
 
-    # Columns to read from CSV (uses the exact headers of the CSV export)
-    usecols = Headers.original_headers()
-
-    # Dtype mapping (excluding datetimes)
-    dtype_schema = {
-        header.value: header.dtype
-        for header in Headers
-        if header.dtype != "datetime64[ns]"
-    }
-
-    # Date columns to parse
-    parse_dates = [
-    header.value 
-    for header in Headers
-    if header.dtype == "datetime64[ns]"
-    ]
-
-    # Rename dictionary: CSV Header String -> Clean Internal Name
-    rename_map = Headers.rename_map()
-
-    # --- Read CSV ---
-    df = pd.read_csv(
-    data_file,
-    sep=";",
-    header=0,
-    usecols=usecols,
-    dtype=dtype_schema, # type: ignore
-    parse_dates=parse_dates,
+    # --- Read CSV (header already consumed, so names come from the variant) ---
+    chunks = pd.read_csv(
+    stream,
+    sep=config.sep,
+    header=None,
+    names=config.usecols,
+    dtype=config.dtype, # type: ignore
+    chunksize=CHUNK_ROWS,
     )
+    df = pd.concat(chunks, ignore_index=True)
+    stats.rows = len(df)
 
-    # --- Post-Processing ---
     # Rename CSV headers to clean member names ('ref_currency_amount' -> 'amount', etc.)
-    df = df.rename(columns=rename_map)
+    df = df.rename(columns=config.rename_map)
 
-    # Format Timestamp to Date only
-    date_col = Headers.TIMESTAMP.target_name
-    df[date_col] = df[date_col].dt.date
+    # Same column order whatever the export layout, so hashes and sinks stay stable
+    return df.reindex(columns=[h.target_name for h in Headers])
+
+def load_transactions(
+    data_file: Path, stats: Optional[List[sources.ExportStats]] = None
+) -> pd.DataFrame:
+    """Read a Wallet export (.csv, .csv.gz, .zip...) and return the normalized DataFrame."""
 
-    # Round float columns in bulk
-    float_cols = Headers.target_names_from_dtype("float64")
-    df[float_cols] = df[float_cols].round(2)
+    frames = []
+    for stream, export_stats in sources.open_exports(data_file):
+        with stream:
+            frames.append(read_export(stream, export_stats))
+        if stats is not None:
+            stats.append(export_stats)
+
+    if not frames:
+        raise ValueError(f"No CSV export found in '{data_file}'.")
+    df = pd.concat(frames, ignore_index=True)
+
+    # --- Post-Processing ---
+    # Convert every column with its registered converter (floats, booleans, dates, tags...)
+    df = converters.apply_converters(df)
 
-    # Normalize string columns in bulk
-    string_cols = Headers.target_names_from_dtype("string")
-    for col in string_cols:
-        # Replace empty strings with NA first
-        df[col] = df[col].replace("", pd.NA)
-        # Convert to object type and fill remaining NA with None
-        df[col] = df[col].astype(object).where(df[col].notna(), None)
+    # Stable identity across re-exports (needs the full timestamp, so before truncating it)
+    df['identity_key'] = utils.generate_identity_keys(df)
+
+    # Format Timestamp to Date only (the full UTC timestamp stays in 'recorded_at' for dedupe)
+    date_col = Headers.TIMESTAMP.target_name
+    df['recorded_at'] = df[date_col]
+    df[date_col] = df[date_col].dt.date
 
     # 5. Generate idempotency key for duplicates
     df['idempotency_key'] = df.apply(utils.generate_idempotency_key, axis=1)
 
+    return df
+
+def main():
+    """Execute the data processing from csv to dataframe."""
+
+    # Targeting the file
+    data_dir = Path(__file__).parent.parent / "data"
+    filename = "fake_wallet_record.csv"
+    data_file = data_dir / filename
+
+    stats: List[sources.ExportStats] = []
+    df = load_transactions(data_file, stats)
+
+    for export_stats in stats:
+        print(export_stats.summary())
     print(df.head())
 
 if __name__ == "__main__":
@@ -1,6 +1,9 @@
 from enum import StrEnum
 from typing import List, Dict
 
+# Values of Headers.DIRECTION (upper-cased) that mean money going out
+EXPENSE_DIRECTIONS = ("USCITA", "EXPENSE")
+
 class Headers(StrEnum):
     """BudgetBaker CSV export headers mapped to internal names."""
     ACCOUNT         = "account"             # Name of the wallet/bank account (e.g., 'Cash', 'Revolut')
@@ -0,0 +1,224 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+import io
+import re
+
+import pandas as pd
+from identity import IDENTITY_COL, OCCURRENCE_COL, with_occurrence
+from main import load_transactions
+from models import Headers
+from search import DEFAULT_INDEX_FILE, SearchIndex
+from snapshots import split_chunks
+import utils
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_ROOT = Path(__file__).parent.parent / "data" / "profiles"
+
+# Profile names become directory names: keep them boring
+_PROFILE_NAME = re.compile(r"^[A-Za-z0-9_-]+$")
+
+# Columns of the per-profile aggregates (everything a household view needs)
+AGGREGATE_KEYS = [
+    "month",
+    Headers.CATEGORY.target_name,
+    Headers.DIRECTION.target_name,
+    Headers.IS_TRANSFER.target_name,
+]
+
+
+class FileLock:
+    """
+    Exclusive lock on a file, shared between processes (not only threads).
+
+    Blocks until the lock is free. The lock file itself is never deleted,
+    so there is no race between "unlink" and "open" in another process.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self) -> FileLock:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a+")
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        self._file.close()
+        self._file = None
+
+
+class Profile:
+    """
+    The dataset of one household member.
+
+    Layout:
+        <root>/<name>/partitions/<YYYY-MM>.pkl.gz   normalized rows, one file per month
+        <root>/<name>/aggregates.pkl.gz             monthly totals, used by the household view
+        <root>/<name>/.lock                         held while ingesting
+    """
+
+    def __init__(self, name: str, root: Path = DEFAULT_ROOT):
+        if not _PROFILE_NAME.match(name):
+            raise ValueError(f"Invalid profile name '{name}': use letters, digits, '-' and '_'.")
+        self.name = name
+        self.path = root / name
+        self.partitions = self.path / "partitions"
+        self.aggregates_file = self.path / "aggregates.pkl.gz"
+
+    def lock(self) -> FileLock:
+        return FileLock(self.path / ".lock")
+
+    def load(self) -> pd.DataFrame:
+        """All the rows of the profile (reads every partition)."""
+        paths = sorted(self.partitions.glob("*.pkl.gz")) if self.partitions.exists() else []
+        if not paths:
+            return pd.DataFrame()
+        return pd.concat(
+            (pd.read_pickle(path, compression="gzip") for path in paths), ignore_index=True
+        )
+
+    def aggregates(self) -> pd.DataFrame:
+        """Monthly totals of the profile, as written by the last ingestion."""
+        if not self.aggregates_file.exists():
+            return pd.DataFrame(columns=AGGREGATE_KEYS + ["amount", "transactions"])
+        return pd.read_pickle(self.aggregates_file, compression="gzip")
+
+
+def _write_pickle(path: Path, df: pd.DataFrame) -> None:
+    buffer = io.BytesIO()
+    df.to_pickle(buffer, compression="gzip")
+    utils.atomic_write(path, buffer.getvalue())
+
+
+def merge_partition(existing: pd.DataFrame, chunk: pd.DataFrame) -> pd.DataFrame:
+    """
+    Merges the rows of a new export into a month partition.
+
+    Rows are matched on (identity key, occurrence) like diff_exports(), so a
+    transaction exported again (maybe edited since) replaces its older
+    version, while two real charges sharing an identity key both stay.
+    """
+    on = [IDENTITY_COL, OCCURRENCE_COL]
+    merged = pd.concat([with_occurrence(existing), with_occurrence(chunk)], ignore_index=True)
+    return merged.drop_duplicates(on, keep="last").drop(columns=OCCURRENCE_COL)
+
+
+def monthly_aggregates(df: pd.DataFrame) -> pd.DataFrame:
+    """Sum and count of amounts per month, category, direction and transfer flag."""
+    months = pd.to_datetime(df[Headers.TIMESTAMP.target_name]).dt.strftime("%Y-%m")
+    return (
+        df.assign(month=months)
+        .groupby(AGGREGATE_KEYS, dropna=False)[Headers.AMOUNT.target_name]
+        .agg(amount="sum", transactions="count")
+        .reset_index()
+    )
+
+
+def ingest_profile(
+    name: str,
+    data_file: Path,
+    root: Path = DEFAULT_ROOT,
+    index_file: Optional[Path] = DEFAULT_INDEX_FILE,
+) -> Dict[str, int]:
+    """
+    Loads an export into a profile, merging it with what the profile already has.
+
+    Only the month partitions present in the export are rewritten, and only
+    their monthly totals are recomputed. The profile lock makes two
+    ingestions of the same profile wait for each other, while different
+    profiles run fully in parallel. The shared search index has its own
+    lock, held only while it's being updated.
+
+    Returns:
+        Dict[str, int]: Rows read and months rewritten.
+    """
+    profile = Profile(name, root)
+    df = load_transactions(data_file)
+    chunks = split_chunks(df)
+
+    with profile.lock():
+        rewritten = []
+        for month, chunk in chunks.items():
+            path = profile.partitions / f"{month}.pkl.gz"
+            existing = (
+                pd.read_pickle(path, compression="gzip") if path.exists() else chunk.iloc[:0]
+            )
+            partition = merge_partition(existing, chunk).reset_index(drop=True)
+            _write_pickle(path, partition)
+            rewritten.append(partition)
+
+        # Only the rewritten months are recomputed, the others keep their totals
+        fresh = monthly_aggregates(pd.concat(rewritten, ignore_index=True))
+        previous = profile.aggregates()
+        kept = previous[~previous["month"].isin(fresh["month"])]
+        aggregates = pd.concat([kept, fresh], ignore_index=True) if not kept.empty else fresh
+        _write_pickle(
+            profile.aggregates_file,
+            aggregates.sort_values(AGGREGATE_KEYS, kind="stable").reset_index(drop=True),
+        )
+
+    if index_file is not None:
+        with FileLock(index_file.with_name(index_file.name + ".lock")):
+            with SearchIndex(index_file) as index:
+                index.add(df)
+
+    return {"rows": len(df), "months": len(chunks)}
+
+
+def ingest_household(
+    exports: Dict[str, Path],
+    root: Path = DEFAULT_ROOT,
+    index_file: Optional[Path] = DEFAULT_INDEX_FILE,
+    max_workers: Optional[int] = None,
+) -> Dict[str, Dict[str, int]]:
+    """Ingests the exports of several profiles in parallel processes."""
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            name: pool.submit(ingest_profile, name, data_file, root, index_file)
+            for name, data_file in exports.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
+def list_profiles(root: Path = DEFAULT_ROOT) -> List[str]:
+    """Names of the profiles that have a directory under `root`."""
+    if not root.exists():
+        return []
+    return sorted(p.name for p in root.iterdir() if p.is_dir() and _PROFILE_NAME.match(p.name))
+
+
+def household_view(root: Path = DEFAULT_ROOT) -> pd.DataFrame:
+    """
+    Monthly totals of the whole household.
+
+    Built by merging the small per-profile aggregates, so no profile's
+    transactions are read again.
+    """
+    frames = [Profile(name, root).aggregates() for name in list_profiles(root)]
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=AGGREGATE_KEYS + ["amount", "transactions"])
+    return (
+        pd.concat(frames, ignore_index=True)
+        .groupby(AGGREGATE_KEYS, dropna=False)[["amount", "transactions"]]
+        .sum()
+        .reset_index()
+    )
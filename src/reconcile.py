@@ -0,0 +1,185 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from models import EXPENSE_DIRECTIONS, Headers
+import converters
+
+# Max days between the Wallet date and the bank booking date of the same transaction
+DATE_TOLERANCE_DAYS = 3
+
+
+@dataclass(frozen=True)
+class BankFormat:
+    """How to read the CSV statement of a bank."""
+    date_col: str
+    description_col: str
+    # Either one signed amount column, or separate credit/debit columns
+    amount_col: Optional[str] = None
+    credit_col: Optional[str] = None
+    debit_col: Optional[str] = None
+    sep: str = ";"
+    dayfirst: bool = True
+    skiprows: int = 0
+    encoding: str = "utf-8-sig"
+
+
+# Statement layouts of the banks I use, keyed by Wallet account name.
+# Banks change their exports too: adjust the column names if a file doesn't load.
+BANK_FORMATS: Dict[str, BankFormat] = {
+    "Fineco": BankFormat(
+        date_col="Data_Operazione", description_col="Descrizione_Completa",
+        credit_col="Entrate", debit_col="Uscite",
+    ),
+    "Illimity Bank": BankFormat(
+        date_col="Data operazione", description_col="Descrizione", amount_col="Importo",
+    ),
+    "Intesa Sanpaolo": BankFormat(
+        date_col="Data contabile", description_col="Descrizione",
+        credit_col="Accrediti", debit_col="Addebiti",
+    ),
+}
+
+
+@dataclass
+class ReconciliationResult:
+    matched: pd.DataFrame          # one row per matched pair (wallet_row, bank_row, days_apart)
+    unmatched_wallet: pd.DataFrame  # in Wallet but not on the statement
+    unmatched_bank: pd.DataFrame    # on the statement but missing in Wallet
+
+    def summary(self) -> str:
+        """Return a human-readable one-line summary."""
+        return (
+            f"✅ {len(self.matched)} matched | "
+            f"⚠️ {len(self.unmatched_wallet)} only in Wallet | "
+            f"⚠️ {len(self.unmatched_bank)} only on the statement"
+        )
+
+
+def load_statement(path: Path, account: str, fmt: Optional[BankFormat] = None) -> pd.DataFrame:
+    """
+    Reads a bank CSV statement and maps it to the Headers target names.
+
+    Amounts are stored positive with 'Uscita'/'Entrata' in direction,
+    exactly like the Wallet export.
+    """
+    fmt = fmt or BANK_FORMATS[account]
+    raw = pd.read_csv(
+        path, sep=fmt.sep, skiprows=fmt.skiprows, dtype="string", encoding=fmt.encoding
+    )
+
+    if fmt.amount_col is not None:
+        signed = converters.to_float(raw[fmt.amount_col])
+    else:
+        credit = converters.to_float(raw[fmt.credit_col]).fillna(0.0)
+        # Some banks write debits as negative numbers, some as positive
+        debit = converters.to_float(raw[fmt.debit_col]).fillna(0.0).abs()
+        signed = credit - debit
+
+    return pd.DataFrame({
+        Headers.ACCOUNT.target_name: account,
+        Headers.AMOUNT.target_name: signed.abs().round(2),
+        Headers.DIRECTION.target_name: np.where(signed < 0, "Uscita", "Entrata"),
+        Headers.NOTE.target_name: converters.to_string(raw[fmt.description_col]),
+        Headers.TIMESTAMP.target_name: pd.to_datetime(
+            raw[fmt.date_col], dayfirst=fmt.dayfirst, errors="coerce"
+        ).dt.date,
+    })
+
+
+def _match_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """Account, signed amount in cents and date of every row (original index kept)."""
+    direction = df[Headers.DIRECTION.target_name].fillna("").astype(str).str.upper()
+    sign = np.where(direction.isin(EXPENSE_DIRECTIONS), -1, 1)
+    keys = pd.DataFrame({
+        "account": df[Headers.ACCOUNT.target_name].astype(str),
+        "cents": (df[Headers.AMOUNT.target_name] * 100 * sign).round(),
+        "date": pd.to_datetime(df[Headers.TIMESTAMP.target_name]),
+        "row": df.index,
+    }).dropna(subset=["cents", "date"])
+    return keys.astype({"cents": "int64"})
+
+
+def reconcile(
+    wallet: pd.DataFrame, bank: pd.DataFrame, tolerance_days: int = DATE_TOLERANCE_DAYS
+) -> ReconciliationResult:
+    """
+    Pairs bank statement rows with Wallet rows of the same account and amount.
+
+    First, inside each (account, amount) bucket with the same number of rows
+    on both sides, the n-th bank row (by date) is paired with the n-th Wallet
+    row when their dates are close enough: booking delays rarely change the
+    order of equal charges.
+
+    Then, for what's left, each pass is one merge_asof (a sorted join on the
+    date, by account and amount) that gives every bank row its nearest Wallet
+    row within the tolerance. When two bank rows pick the same Wallet row,
+    the closest one wins and the other tries again in the next pass against
+    what's left. This repeats until no new pair is found.
+    """
+    tolerance = pd.Timedelta(days=tolerance_days)
+    accounts = bank[Headers.ACCOUNT.target_name].unique()
+    wallet = wallet[wallet[Headers.ACCOUNT.target_name].isin(accounts)]
+
+    free_wallet = _match_keys(wallet).sort_values("date")
+    free_bank = _match_keys(bank).sort_values("date")
+    pairs = []
+
+    def _take(best: pd.DataFrame) -> None:
+        nonlocal free_wallet, free_bank
+        best["wallet_row"] = best["wallet_row"].astype(wallet.index.dtype)
+        pairs.append(best[["wallet_row", "bank_row", "days_apart"]])
+        free_wallet = free_wallet[~free_wallet["row"].isin(best["wallet_row"])]
+        free_bank = free_bank[~free_bank["row"].isin(best["bank_row"])]
+
+    # Rank pass: n-th with n-th, only in buckets with as many bank rows as Wallet rows
+    # (with extra rows on one side, the n-th row may not be the right partner)
+    bucket = ["account", "cents"]
+    sizes = pd.merge(
+        free_bank.groupby(bucket).size().rename("bank_rows").reset_index(),
+        free_wallet.groupby(bucket).size().rename("wallet_rows").reset_index(),
+        on=bucket,
+    )
+    balanced = sizes.loc[sizes["bank_rows"] == sizes["wallet_rows"], bucket]
+    bank_ranked = free_bank.merge(balanced, on=bucket)
+    wallet_ranked = free_wallet.merge(balanced, on=bucket)
+    ranked = pd.merge(
+        bank_ranked.assign(n=bank_ranked.groupby(bucket).cumcount()).rename(columns={"row": "bank_row"}),
+        wallet_ranked.assign(n=wallet_ranked.groupby(bucket).cumcount())
+        .rename(columns={"row": "wallet_row", "date": "wallet_date"}),
+        on=bucket + ["n"],
+    )
+    ranked["days_apart"] = (ranked["date"] - ranked["wallet_date"]).dt.days.abs()
+    _take(ranked[ranked["days_apart"] <= tolerance_days].copy())
+
+    # Nearest-date passes for the rest
+    while not free_wallet.empty and not free_bank.empty:
+        candidates = pd.merge_asof(
+            free_bank,
+            free_wallet.rename(columns={"row": "wallet_row", "date": "wallet_date"})
+            .assign(date=lambda d: d["wallet_date"]),
+            on="date",
+            by=["account", "cents"],
+            direction="nearest",
+            tolerance=tolerance,
+        ).dropna(subset=["wallet_row"])
+        if candidates.empty:
+            break
+
+        # One bank row per Wallet row: keep the closest date
+        candidates["days_apart"] = (candidates["date"] - candidates["wallet_date"]).dt.days.abs()
+        best = candidates.sort_values(["days_apart", "date"], kind="stable").drop_duplicates("wallet_row")
+        _take(best.rename(columns={"row": "bank_row"}))
+
+    matched = (
+        pd.concat(pairs, ignore_index=True) if pairs
+        else pd.DataFrame(columns=["wallet_row", "bank_row", "days_apart"])
+    )
+    return ReconciliationResult(
+        matched=matched,
+        unmatched_wallet=wallet.drop(index=matched["wallet_row"]),
+        unmatched_bank=bank.drop(index=matched["bank_row"]),
+    )
@@ -0,0 +1,130 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Tuple
+import hashlib
+
+from models import Headers
+
+
+@dataclass(frozen=True)
+class SchemaVariant:
+    """A known layout of the Wallet CSV export (header names + order)."""
+    name: str
+    # (raw CSV header, Headers member) pairs in the exact order of the export
+    columns: Tuple[Tuple[str, Headers], ...]
+    sep: str = ";"
+
+    @property
+    def header_line(self) -> str:
+        """The header line exactly as it appears in the CSV export."""
+        return self.sep.join(raw for raw, _ in self.columns)
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the header line, used to detect the variant of a file."""
+        return header_fingerprint(self.header_line)
+
+
+@dataclass(frozen=True)
+class ReaderConfig:
+    """Everything pandas.read_csv needs for a variant, derived only once."""
+    sep: str
+    usecols: List[str]
+    dtype: Dict[str, str]
+    rename_map: Dict[str, str]
+
+
+def header_fingerprint(header_line: str) -> str:
+    """
+    Returns a stable hash of a CSV header line.
+
+    Only the BOM and the trailing newline are removed, so any other change
+    in the layout (names, order, separator) gives a different fingerprint.
+    """
+    cleaned = header_line.lstrip("﻿").strip()
+    return hashlib.sha256(cleaned.encode("utf-8")).hexdigest()
+
+
+# What I get as of 28/02/2026 by downloading CSVs from Wallet
+WALLET_2026_02 = SchemaVariant(
+    name="wallet_2026_02",
+    columns=tuple((header.value, header) for header in Headers),
+)
+
+# Known layouts, keyed by header fingerprint
+_REGISTRY: Dict[str, SchemaVariant] = {}
+
+
+def register_variant(variant: SchemaVariant) -> SchemaVariant:
+    """
+    Adds a header variant to the registry.
+
+    Raises:
+        ValueError: If the variant does not map every Headers member exactly once.
+    """
+    members = [member for _, member in variant.columns]
+    if sorted(members) != sorted(Headers):
+        raise ValueError(
+            f"Variant '{variant.name}' must map every Headers member exactly once."
+        )
+    _REGISTRY[variant.fingerprint] = variant
+    return variant
+
+
+def known_variants() -> List[SchemaVariant]:
+    """Returns all the registered header variants."""
+    return list(_REGISTRY.values())
+
+
+def detect_variant(header_line: str) -> SchemaVariant:
+    """
+    Finds the registered variant matching a CSV header line.
+
+    Exact layouts are a single dictionary lookup on the fingerprint. If the
+    same headers only come in a different order, the reordered layout is
+    registered on the fly so the next file with it is a direct hit.
+
+    Raises:
+        ValueError: If the header names do not match any known variant.
+    """
+    fingerprint = header_fingerprint(header_line)
+    if fingerprint in _REGISTRY:
+        return _REGISTRY[fingerprint]
+
+    cleaned = header_line.lstrip("﻿").strip()
+    for variant in known_variants():
+        actual_columns = [col.strip() for col in cleaned.split(variant.sep)]
+        by_raw = dict(variant.columns)
+        if sorted(actual_columns) == sorted(by_raw):
+            reordered = SchemaVariant(
+                name=f"{variant.name}_reordered",
+                columns=tuple((raw, by_raw[raw]) for raw in actual_columns),
+                sep=variant.sep,
+            )
+            return register_variant(reordered)
+
+    raise ValueError(
+        f"Unknown CSV header layout -> '{cleaned}'. "
+        "Register it with schemas.register_variant()."
+    )
+
+
+@lru_cache(maxsize=None)
+def compile_reader_config(variant: SchemaVariant) -> ReaderConfig:
+    """
+    Builds (once per variant) the pandas.read_csv arguments for a layout.
+
+    Every column is read as raw text: typing is done afterwards by the
+    converters registered in converters.py, keyed by Headers member.
+    """
+    return ReaderConfig(
+        sep=variant.sep,
+        usecols=[raw for raw, _ in variant.columns],
+        dtype={raw: "string" for raw, _ in variant.columns},
+        # Raw CSV header -> clean internal name
+        rename_map={raw: member.target_name for raw, member in variant.columns},
+    )
+
+
+register_variant(WALLET_2026_02)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Iterable, List, Optional
+import re
+import sqlite3
+
+import pandas as pd
+from models import Headers
+
+DEFAULT_INDEX_FILE = Path(__file__).parent.parent / "data" / "search_index.sqlite"
+
+# Free-text fields that go into the index (Headers target names)
+INDEXED_FIELDS = (
+    Headers.NOTE.target_name,
+    Headers.COUNTERPARTY.target_name,
+    Headers.TAGS.target_name,
+)
+
+# unicode61 folds case and accents ('Università' -> 'universita') and splits
+# on apostrophes, so Italian elisions like "dell'auto" also match 'auto'.
+# prefix='2 3' keeps extra indexes so short prefix queries don't scan the vocabulary.
+_SCHEMA = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+    idempotency_key UNINDEXED,
+    {", ".join(INDEXED_FIELDS)},
+    tokenize = "unicode61 remove_diacritics 2",
+    prefix = '2 3'
+);
+-- Key -> FTS rowid, so lookups and deletes by key don't scan the FTS table
+CREATE TABLE IF NOT EXISTS indexed_keys (
+    idempotency_key TEXT PRIMARY KEY,
+    fts_rowid INTEGER NOT NULL
+);
+"""
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def _as_text(value) -> str:
+    """Index text of a cell: lists of tags are joined, missing values are empty."""
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(v) for v in value)
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ""
+    return str(value)
+
+
+def build_match_query(text: str) -> str:
+    """
+    Turns what the user typed into an FTS5 query where every word is a prefix.
+
+    Example: "farm cent" -> '"farm"* "cent"*' (both words must match).
+    """
+    return " ".join(f'"{word}"*' for word in _WORD.findall(text))
+
+
+class SearchIndex:
+    """Persistent full-text index (SQLite FTS5) over notes, payees and labels."""
+
+    def __init__(self, path: Path = DEFAULT_INDEX_FILE):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> SearchIndex:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def indexed_keys(self) -> set:
+        """Idempotency keys already in the index."""
+        return {row[0] for row in self._conn.execute("SELECT idempotency_key FROM indexed_keys")}
+
+    def add(self, df: pd.DataFrame) -> int:
+        """
+        Indexes the rows of a normalized DataFrame that are not indexed yet.
+
+        Returns:
+            int: Number of newly indexed rows.
+        """
+        new_rows = df[~df["idempotency_key"].isin(self.indexed_keys())]
+        new_rows = new_rows.drop_duplicates("idempotency_key")
+
+        records = zip(
+            new_rows["idempotency_key"],
+            *(new_rows[field].map(_as_text) for field in INDEXED_FIELDS),
+        )
+        placeholders = ", ".join("?" * (len(INDEXED_FIELDS) + 1))
+        with self._conn:  # one transaction for the whole batch
+            for record in records:
+                cursor = self._conn.execute(
+                    f"INSERT INTO transactions_fts VALUES ({placeholders})", record
+                )
+                self._conn.execute(
+                    "INSERT INTO indexed_keys VALUES (?, ?)", (record[0], cursor.lastrowid)
+                )
+        return len(new_rows)
+
+    def remove(self, keys: Iterable[str]) -> None:
+        """Drops rows from the index (e.g., deleted in the app)."""
+        with self._conn:
+            for key in keys:
+                row = self._conn.execute(
+                    "SELECT fts_rowid FROM indexed_keys WHERE idempotency_key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    continue
+                self._conn.execute("DELETE FROM transactions_fts WHERE rowid = ?", row)
+                self._conn.execute("DELETE FROM indexed_keys WHERE idempotency_key = ?", (key,))
+
+    def search(
+        self, text: str, fields: Optional[Iterable[str]] = None, limit: int = 100
+    ) -> List[str]:
+        """
+        Returns the idempotency keys matching `text`, best matches first.
+
+        Args:
+            text (str): Words to look for; each one is treated as a prefix.
+            fields (Iterable[str], optional): Restrict to some of INDEXED_FIELDS.
+            limit (int): Max number of keys returned.
+        """
+        query = build_match_query(text)
+        if not query:
+            return []
+        if fields:
+            query = f"{{{' '.join(fields)}}} : ({query})"
+
+        rows = self._conn.execute(
+            "SELECT idempotency_key FROM transactions_fts "
+            "WHERE transactions_fts MATCH ? ORDER BY bm25(transactions_fts) LIMIT ?",
+            (query, limit),
+        )
+        return [row[0] for row in rows]
+
+
+def search_transactions(df: pd.DataFrame, index: SearchIndex, text: str, **kwargs) -> pd.DataFrame:
+    """Rows of `df` matching `text`, in relevance order."""
+    keys = index.search(text, **kwargs)
+    positions = {key: i for i, key in enumerate(keys)}
+    matches = df[df["idempotency_key"].isin(positions)]
+    return matches.sort_values("idempotency_key", key=lambda s: s.map(positions))
@@ -0,0 +1,223 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import List, Optional, Tuple
+import io
+import os
+import struct
+
+import pandas as pd
+from models import Headers
+import converters
+
+try:
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+except ImportError:  # optional dependency, only needed for encrypted output
+    AESGCM = None
+
+# Rows encrypted together; each chunk can be decrypted on its own
+CHUNK_ROWS = 10_000
+
+MAGIC = b"BBRIDGE\x01"
+NONCE_SIZE = 12
+FILE_ID_SIZE = 16
+# Index entry: (offset, size) of an encrypted chunk
+_INDEX_ENTRY = struct.Struct(">QI")
+# Trailer: size of the encrypted index + magic
+_TRAILER = struct.Struct(">I8s")
+
+
+def _require_aesgcm():
+    """Returns the AESGCM class or explains how to get it."""
+    if AESGCM is None:
+        raise ImportError(
+            "Encrypted output needs the 'cryptography' package: pip install cryptography"
+        )
+    return AESGCM
+
+
+def generate_key() -> bytes:
+    """Returns a new random 256-bit key. Store it outside the data directory!"""
+    return _require_aesgcm().generate_key(bit_length=256)
+
+
+def _chunk_aad(file_id: bytes, index: int) -> bytes:
+    """Associated data binding a chunk to its file and position (no swapping/reordering)."""
+    return file_id + struct.pack(">Q", index)
+
+
+def _index_aad(file_id: bytes) -> bytes:
+    return file_id + b"index"
+
+
+def _to_csv_bytes(df: pd.DataFrame, header: bool = True) -> bytes:
+    """
+    Serializes rows as ';'-separated CSV in the export's own text format.
+
+    Tags are written back as 'a,b' (not as a Python list repr), so
+    converters.apply_converters() turns the text into the pipeline types again.
+    """
+    tags = Headers.TAGS.target_name
+    if tags in df.columns:
+        df = df.assign(**{tags: df[tags].map(
+            lambda values: ",".join(values) if isinstance(values, list) else values
+        )})
+    return df.to_csv(sep=";", index=False, header=header).encode("utf-8")
+
+
+class CsvSink:
+    """Plaintext sink: writes the pipeline output to a ';'-separated CSV file."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file: Optional[io.BufferedWriter] = None
+        self._header_written = False
+
+    def __enter__(self) -> CsvSink:
+        self._file = open(self.path, "wb")
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def write(self, df: pd.DataFrame) -> None:
+        """Appends rows to the file."""
+        assert self._file is not None, "Use the sink as a context manager"
+        self._file.write(_to_csv_bytes(df, header=not self._header_written))
+        self._header_written = True
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class EncryptedSink:
+    """
+    Writes the pipeline output encrypted with AES-256-GCM, one chunk at a time.
+
+    File layout:
+        MAGIC | file_id | chunk 0 | chunk 1 | ... | encrypted index | trailer
+
+    Every chunk is nonce + ciphertext of CSV rows, authenticated with its
+    position in the file. The index of chunk offsets is encrypted too, so
+    a truncated or reordered file fails to decrypt instead of losing rows silently.
+
+    Chunks go to a temporary file that replaces `path` only on a clean
+    close: if the `with` body raises, nothing is sealed and `path` is untouched.
+    """
+
+    def __init__(self, path: Path, key: bytes, chunk_rows: int = CHUNK_ROWS):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self._aead = _require_aesgcm()(key)
+        self._file_id = os.urandom(FILE_ID_SIZE)
+        self._tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        self._file: Optional[io.BufferedWriter] = None
+        self._index: List[Tuple[int, int]] = []
+
+    def __enter__(self) -> EncryptedSink:
+        self._file = open(self._tmp_path, "wb")
+        self._file.write(MAGIC + self._file_id)
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+    def write(self, df: pd.DataFrame) -> None:
+        """Encrypts and appends rows, in chunks of `chunk_rows`."""
+        assert self._file is not None, "Use the sink as a context manager"
+        for start in range(0, len(df), self.chunk_rows):
+            self._write_chunk(_to_csv_bytes(df.iloc[start:start + self.chunk_rows]))
+
+    def _write_chunk(self, plaintext: bytes) -> None:
+        nonce = os.urandom(NONCE_SIZE)
+        aad = _chunk_aad(self._file_id, len(self._index))
+        blob = nonce + self._aead.encrypt(nonce, plaintext, aad)
+
+        self._index.append((self._file.tell(), len(blob)))  # type: ignore[union-attr]
+        self._file.write(blob)  # type: ignore[union-attr]
+
+    def close(self) -> None:
+        """Writes the encrypted chunk index, closes the file and moves it to `path`."""
+        if self._file is None:
+            return
+        index_plain = b"".join(_INDEX_ENTRY.pack(offset, size) for offset, size in self._index)
+        nonce = os.urandom(NONCE_SIZE)
+        index_blob = nonce + self._aead.encrypt(nonce, index_plain, _index_aad(self._file_id))
+
+        self._file.write(index_blob)
+        self._file.write(_TRAILER.pack(len(index_blob), MAGIC))
+        self._file.close()
+        self._file = None
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self) -> None:
+        """Drops what was written so far: a partial file must never authenticate."""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        self._tmp_path.unlink(missing_ok=True)
+
+
+class EncryptedReader:
+    """Random-access reader for files written by EncryptedSink."""
+
+    def __init__(self, path: Path, key: bytes):
+        self.path = path
+        self._aead = _require_aesgcm()(key)
+
+        with open(path, "rb") as f:
+            header = f.read(len(MAGIC) + FILE_ID_SIZE)
+            if header[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not a BudgetBridge encrypted file.")
+            self._file_id = header[len(MAGIC):]
+
+            f.seek(-_TRAILER.size, os.SEEK_END)
+            index_size, magic = _TRAILER.unpack(f.read(_TRAILER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is truncated (missing trailer).")
+            f.seek(-(_TRAILER.size + index_size), os.SEEK_END)
+            index_blob = f.read(index_size)
+
+        index_plain = self._decrypt(index_blob, _index_aad(self._file_id))
+        self._index = [
+            _INDEX_ENTRY.unpack_from(index_plain, pos)
+            for pos in range(0, len(index_plain), _INDEX_ENTRY.size)
+        ]
+
+    def __len__(self) -> int:
+        """Number of encrypted chunks in the file."""
+        return len(self._index)
+
+    def _decrypt(self, blob: bytes, aad: bytes) -> bytes:
+        return self._aead.decrypt(blob[:NONCE_SIZE], blob[NONCE_SIZE:], aad)
+
+    def read_chunk_bytes(self, index: int) -> bytes:
+        """Decrypts a single chunk, reading only its bytes from disk."""
+        offset, size = self._index[index]
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            blob = f.read(size)
+        return self._decrypt(blob, _chunk_aad(self._file_id, index))
+
+    def read_chunk(self, index: int) -> pd.DataFrame:
+        """Decrypts a single chunk into a DataFrame with the pipeline's column types."""
+        df = pd.read_csv(io.BytesIO(self.read_chunk_bytes(index)), sep=";", dtype="string")
+        df = converters.apply_converters(df)
+        # The pipeline output stores dates, with the full timestamp in 'recorded_at'
+        date_col = Headers.TIMESTAMP.target_name
+        if date_col in df.columns:
+            df[date_col] = df[date_col].dt.date
+        if "recorded_at" in df.columns:
+            df["recorded_at"] = converters.to_datetime(df["recorded_at"])
+        return df
+
+    def read_all(self) -> pd.DataFrame:
+        """Decrypts every chunk, in order."""
+        if not self._index:
+            return pd.DataFrame()
+        return pd.concat((self.read_chunk(i) for i in range(len(self))), ignore_index=True)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import io
+import json
+
+import pandas as pd
+from models import Headers
+import utils
+
+DEFAULT_ROOT = Path(__file__).parent.parent / "data" / "snapshots"
+
+
+def split_chunks(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Splits the dataset into one chunk per month, in a canonical row order.
+
+    A new import mostly touches the latest months, so the chunks of older
+    months keep the same content (and the same hash) from one import to the next.
+    """
+    months = pd.to_datetime(df[Headers.TIMESTAMP.target_name]).dt.strftime("%Y-%m").fillna("undated")
+    chunks = {}
+    for month, chunk in df.groupby(months, sort=True):
+        chunks[month] = chunk.sort_values("idempotency_key", kind="stable").reset_index(drop=True)
+    return chunks
+
+
+def chunk_hash(chunk: pd.DataFrame) -> str:
+    """Content address of a chunk: SHA-256 of its canonical CSV text."""
+    return hashlib.sha256(chunk.to_csv(index=False).encode("utf-8")).hexdigest()
+
+
+class SnapshotStore:
+    """
+    Versioned snapshots of the normalized dataset.
+
+    Layout:
+        objects/<2 chars>/<hash>.pkl.gz   one chunk, stored once, shared by snapshots
+        manifests/<snapshot id>.json      the list of chunk hashes of a snapshot
+    """
+
+    def __init__(self, root: Path = DEFAULT_ROOT):
+        self.root = root
+        self.objects = root / "objects"
+        self.manifests = root / "manifests"
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / f"{digest}.pkl.gz"
+
+    def commit(self, df: pd.DataFrame, label: str = "") -> Tuple[str, int]:
+        """
+        Stores a snapshot of the dataset.
+
+        Returns:
+            Tuple[str, int]: The snapshot id and how many chunks were actually
+                written (the others were already in the store).
+        """
+        created = datetime.now(timezone.utc)
+        version = utils.dataset_version(df)
+        entries = []
+        written = 0
+
+        for month, chunk in split_chunks(df).items():
+            digest = chunk_hash(chunk)
+            path = self._object_path(digest)
+            if not path.exists():
+                buffer = io.BytesIO()
+                chunk.to_pickle(buffer, compression="gzip")
+                utils.atomic_write(path, buffer.getvalue())
+                written += 1
+            entries.append({"month": month, "hash": digest, "rows": len(chunk)})
+
+        snapshot_id = f"{created:%Y%m%dT%H%M%S%f}-{version[:8]}"
+        manifest = {
+            "id": snapshot_id,
+            "created": created.isoformat(),
+            "label": label,
+            "version": version,
+            "columns": list(df.columns),
+            "chunks": entries,
+        }
+        utils.atomic_write(
+            self.manifests / f"{snapshot_id}.json", json.dumps(manifest, indent=2).encode("utf-8")
+        )
+        return snapshot_id, written
+
+    def list(self) -> List[dict]:
+        """All the snapshot manifests, oldest first."""
+        if not self.manifests.exists():
+            return []
+        paths = sorted(self.manifests.glob("*.json"))
+        return [json.loads(path.read_text(encoding="utf-8")) for path in paths]
+
+    def manifest(self, snapshot_id: str) -> dict:
+        """
+        Raises:
+            KeyError: If the snapshot does not exist.
+        """
+        path = self.manifests / f"{snapshot_id}.json"
+        if not path.exists():
+            raise KeyError(f"Snapshot '{snapshot_id}' not found.")
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def latest_before(self, when: datetime) -> Optional[str]:
+        """Id of the last snapshot taken before `when` (e.g., before the March import)."""
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        candidates = [m["id"] for m in self.list() if datetime.fromisoformat(m["created"]) < when]
+        return candidates[-1] if candidates else None
+
+    def checkout(self, snapshot_id: str) -> pd.DataFrame:
+        """Rebuilds the dataset of a snapshot, reading only the chunks its manifest lists."""
+        manifest = self.manifest(snapshot_id)
+        chunks = [
+            pd.read_pickle(self._object_path(entry["hash"]), compression="gzip")
+            for entry in manifest["chunks"]
+        ]
+        if not chunks:
+            return pd.DataFrame(columns=manifest["columns"])
+        return pd.concat(chunks, ignore_index=True)[manifest["columns"]]
+
+    def gc(self, keep_last: Optional[int] = None, keep_days: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Applies retention, then deletes the chunks no remaining snapshot uses.
+
+        A snapshot is kept if it is among the `keep_last` newest OR younger
+        than `keep_days`. With no rule at all, every snapshot is kept and only
+        orphan chunks (e.g., from an interrupted commit) are removed.
+
+        Returns:
+            Tuple[int, int]: Number of deleted snapshots and deleted chunks.
+        """
+        manifests = self.list()
+        now = datetime.now(timezone.utc)
+        kept, dropped = [], []
+
+        for position, manifest in enumerate(reversed(manifests)):
+            age = now - datetime.fromisoformat(manifest["created"])
+            recent_enough = keep_days is not None and age <= timedelta(days=keep_days)
+            within_count = keep_last is not None and position < keep_last
+            no_rules = keep_last is None and keep_days is None
+            (kept if no_rules or recent_enough or within_count else dropped).append(manifest)
+
+        for manifest in dropped:
+            (self.manifests / f"{manifest['id']}.json").unlink()
+
+        referenced = {entry["hash"] for manifest in kept for entry in manifest["chunks"]}
+        deleted_chunks = 0
+        if self.objects.exists():
+            for path in self.objects.glob("*/*.pkl.gz"):
+                if path.name.removesuffix(".pkl.gz") not in referenced:
+                    path.unlink()
+                    deleted_chunks += 1
+        return len(dropped), deleted_chunks
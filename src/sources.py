@@ -0,0 +1,100 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterator, Tuple
+import bz2
+import gzip
+import io
+import lzma
+import time
+import zipfile
+
+# Single-file compression formats, by file suffix
+_OPENERS = {
+    ".gz": gzip.open,
+    ".bz2": bz2.open,
+    ".xz": lzma.open,
+}
+
+
+@dataclass
+class ExportStats:
+    """Counters collected while reading one export."""
+    name: str
+    compressed_bytes: int = 0
+    decompressed_bytes: int = 0
+    read_seconds: float = 0.0
+    rows: int = 0
+
+    @property
+    def throughput_mb_s(self) -> float:
+        """Decompressed megabytes produced per second spent reading."""
+        if self.read_seconds == 0:
+            return 0.0
+        return self.decompressed_bytes / 1_000_000 / self.read_seconds
+
+    def summary(self) -> str:
+        """Return a human-readable one-line summary."""
+        return (
+            f"{self.name}: {self.rows} rows | "
+            f"{self.compressed_bytes:,} -> {self.decompressed_bytes:,} bytes | "
+            f"{self.throughput_mb_s:.1f} MB/s"
+        )
+
+
+class _CountingReader(io.RawIOBase):
+    """Wraps a binary stream and records how many bytes (and how long) it took."""
+
+    def __init__(self, raw: BinaryIO, stats: ExportStats):
+        self._raw = raw
+        self._stats = stats
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        start = time.perf_counter()
+        data = self._raw.read(len(buffer))
+        self._stats.read_seconds += time.perf_counter() - start
+
+        size = len(data)
+        buffer[:size] = data
+        self._stats.decompressed_bytes += size
+        return size
+
+    def close(self) -> None:
+        self._raw.close()
+        super().close()
+
+
+def _binary_exports(data_file: Path) -> Iterator[Tuple[str, BinaryIO, int]]:
+    """Yields (name, decompressed byte stream, compressed size) for each export in a file."""
+    suffix = data_file.suffix.lower()
+
+    if suffix == ".zip":
+        # Every CSV member of the archive is a separate export
+        with zipfile.ZipFile(data_file) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or not info.filename.lower().endswith(".csv"):
+                    continue
+                with archive.open(info) as member:
+                    yield f"{data_file.name}:{info.filename}", member, info.compress_size
+        return
+
+    opener = _OPENERS.get(suffix, open)
+    with opener(data_file, "rb") as stream:
+        yield data_file.name, stream, data_file.stat().st_size
+
+
+def open_exports(data_file: Path) -> Iterator[Tuple[io.TextIOWrapper, ExportStats]]:
+    """
+    Yields a text stream for each Wallet export contained in a file.
+
+    Plain .csv, .csv.gz/.bz2/.xz and .zip archives (one export per CSV member)
+    are supported. Decompression happens on the fly while the parser reads,
+    so nothing is ever written to disk.
+    """
+    for name, stream, compressed_size in _binary_exports(data_file):
+        stats = ExportStats(name=name, compressed_bytes=compressed_size)
+        reader = io.BufferedReader(_CountingReader(stream, stats))
+        yield io.TextIOWrapper(reader, encoding="utf-8-sig", newline=""), stats
@@ -1,4 +1,6 @@
 import hashlib
+import os
+from pathlib import Path
 import pandas as pd
 
 def generate_idempotency_key(row) -> str:
@@ -9,4 +11,41 @@ def generate_idempotency_key(row) -> str:
     note = "" if pd.isna(row["note"]) else str(row["note"])
 
     raw_str = f"{account}_{date}_{category}_{amount}_{note}"
-    return hashlib.sha256(raw_str.encode("utf-8")).hexdigest()
\ No newline at end of file
+    return hashlib.sha256(raw_str.encode("utf-8")).hexdigest()
+
+def dataset_version(df: pd.DataFrame) -> str:
+    """
+    Returns a short hash identifying the content of a normalized dataset.
+
+    It only depends on the set of idempotency keys, so re-reading the same
+    exports (in any order) gives the same version.
+    """
+    keys = sorted(df["idempotency_key"].astype(str))
+    return hashlib.sha256("\n".join(keys).encode("utf-8")).hexdigest()[:16]
+
+def generate_identity_keys(df: pd.DataFrame) -> pd.Series:
+    """
+    Returns a key per row built only from attributes the app never lets me edit
+    afterwards: account, timestamp (millisecond precision) and raw amount.
+
+    Unlike the idempotency key, it survives edits of note, category, payee...
+    It must be computed before the timestamp is truncated to the date.
+    """
+    millis = (
+        df["timestamp"].dt.tz_convert("UTC").dt.tz_localize(None)
+        .astype("datetime64[ms]").astype("int64").astype(str)
+    )
+    raw = df["account"].astype(str) + "_" + millis + "_" + df["amount_raw"].astype(str)
+    return pd.Series(
+        [hashlib.sha256(value.encode("utf-8")).hexdigest() for value in raw],
+        index=df.index,
+        dtype=object,
+    )
+
+def atomic_write(path: Path, data: bytes) -> None:
+    """Writes to a temp file first, so a crash never leaves half a file behind."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # The pid keeps two processes writing the same file from sharing a temp file
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)